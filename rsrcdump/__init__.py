@@ -1,24 +1,26 @@
 from os import PathLike
 
 from rsrcdump.resfork import InvalidResourceFork, ResourceFork
-from rsrcdump.adf import unpack_adf, ADF_ENTRYNUM_RESOURCEFORK, pack_adf, NotADFError
-from rsrcdump.jsonio import resource_fork_to_json, json_to_resource_fork
+from rsrcdump.adf import unpack_adf, ADF_ENTRYNUM_RESOURCEFORK, pack_adf, NotADFError, is_adf
+from rsrcdump.jsonio import resource_fork_to_json, json_to_resource_fork, load_resource_fork_from_json
 from rsrcdump.textio import set_global_encoding, parse_type_name
 from rsrcdump.resconverters import standard_converters, StructConverter, Base16Converter
+from rsrcdump.packutils import map_file
 
 
 def load(data_or_path: bytes | PathLike) -> ResourceFork:
     if type(data_or_path) is not bytes:
-        path = data_or_path
-        with open(path, 'rb') as f:
-            data = f.read()
+        with map_file(data_or_path) as data:
+            return _load_from_data(data)
     else:
-        data: bytes = data_or_path
+        return _load_from_data(data_or_path)
 
-    try:
+
+def _load_from_data(data: bytes) -> ResourceFork:
+    if is_adf(data):
         adf_entries = unpack_adf(data)
         adf_resfork = adf_entries[ADF_ENTRYNUM_RESOURCEFORK]
         fork = ResourceFork.from_bytes(adf_resfork)
-    except NotADFError:
+    else:
         fork = ResourceFork.from_bytes(data)
     return fork
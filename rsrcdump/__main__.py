@@ -1,14 +1,13 @@
-import base64
-import json
 import os
 import sys
 import argparse
 
 from rsrcdump.resfork import InvalidResourceFork, ResourceFork
-from rsrcdump.adf import unpack_adf, ADF_ENTRYNUM_RESOURCEFORK, pack_adf, NotADFError
-from rsrcdump.jsonio import resource_fork_to_json, json_to_resource_fork
-from rsrcdump.textio import set_global_encoding, parse_type_name
+from rsrcdump.adf import unpack_adf, ADF_ENTRYNUM_RESOURCEFORK, pack_adf, is_adf
+from rsrcdump.jsonio import resource_fork_to_json, load_resource_fork_from_json
+from rsrcdump.textio import set_global_encoding, set_global_blob_encoding, parse_type_name, encode_blob
 from rsrcdump.resconverters import standard_converters, StructConverter, Base16Converter
+from rsrcdump.packutils import map_file
 
 def main():
     description = (
@@ -72,8 +71,16 @@ def main():
         '--encoding', type=str, default="macroman",
         help="String encoding to use throughout the resource fork (MacRoman by default).")
 
+    parser.add_argument(
+        '--base64', action='store_true',
+        help=("Only valid with -x. Encode raw binary data as base-64 instead of hexadecimal. "
+              "This produces smaller JSON files, but they are harder to edit by hand."))
+
     args = parser.parse_args()
 
+    if args.base64 and not args.extract:
+        parser.error("--base64 only applies to --extract (--create detects base-64 JSON automatically)")
+
     inpath = args.file
 
     only_types = []
@@ -103,28 +110,29 @@ def main():
 
 
     def load_resmap():
-        with open(inpath, 'rb') as file:
-            data = file.read()
-
-        try:
-            adf_entries = unpack_adf(data)
-            adf_resfork = adf_entries[ADF_ENTRYNUM_RESOURCEFORK]
-            fork = ResourceFork.from_bytes(adf_resfork)
-            return fork, adf_entries
-        except NotADFError:
-            fork = ResourceFork.from_bytes(data)
-            return fork, []
+        with map_file(inpath) as data:
+            if is_adf(data):
+                adf_entries = unpack_adf(data)
+                adf_resfork = adf_entries[ADF_ENTRYNUM_RESOURCEFORK]
+                fork = ResourceFork.from_bytes(adf_resfork)
+                return fork, adf_entries
+            else:
+                fork = ResourceFork.from_bytes(data)
+                return fork, []
 
 
     def do_list():
         fork, adf_entries = load_resmap()
-        print(F"{'Type':4} {'ID':6} {'Size':8}  {'Name'}")
-        print(F"{'-'*4} {'-'*6} {'-'*8}  {'-'*32}")
-        for res_type in fork.tree:
-            for res_id in fork.tree[res_type]:
-                res = fork.tree[res_type][res_id]
-                print(F"{res.type_str:4} {res.num:6} {len(res.data):8}  {res.name_str}")
-
+        lines = [
+            F"{'Type':4} {'ID':6} {'Size':8}  {'Name'}",
+            F"{'-'*4} {'-'*6} {'-'*8}  {'-'*32}",
+        ]
+        for res_dir in fork.tree.values():
+            for res in res_dir.values():
+                lines.append(F"{res.type_str:4} {res.num:6} {len(res.data):8}  {res.name_str}")
+
+        # Write the listing in one go rather than one print call per resource
+        sys.stdout.write("\n".join(lines) + "\n")
         return 0
 
 
@@ -148,7 +156,7 @@ def main():
             metadata["adf"] = {}
             del adf_entries[ADF_ENTRYNUM_RESOURCEFORK]
             for adf_entry_num, adf_entry in adf_entries.items():
-                metadata["adf"][adf_entry_num] = base64.b16encode(adf_entry).decode("ascii")
+                metadata["adf"][adf_entry_num] = encode_blob(adf_entry)
 
         return resource_fork_to_json(
             fork,
@@ -169,14 +177,8 @@ def main():
             stem = os.path.basename(stem)
             outpath = os.path.join(os.getcwd(), stem + "_regen.rsrc")
 
-        with open(inpath, "r") as json_file:
-            json_blob = json.load(json_file)
-
-        # We've got to convert the json_blob to ResMap
-        assert isinstance(json_blob, dict)
-
-        fork = json_to_resource_fork(
-            json_blob,
+        fork, adf_entries = load_resource_fork_from_json(
+            inpath,
             converters=converters,
             only_types=only_types,
             skip_types=skip_types,
@@ -187,13 +189,6 @@ def main():
         if args.no_adf:
             output_blob = binary_fork
         else:
-            adf_entries = {}
-            try:
-                adf_metadata = json_blob['_metadata']['adf']
-                for adf_entry_id, adf_entry_blob in adf_metadata.items():
-                    adf_entries[int(adf_entry_id)] = base64.b16decode(adf_entry_blob)
-            except KeyError:
-                pass
             adf_entries[ADF_ENTRYNUM_RESOURCEFORK] = binary_fork
             output_blob = pack_adf(adf_entries)
 
@@ -209,6 +204,9 @@ def main():
     if args.encoding:
         set_global_encoding(args.encoding)
 
+    if args.base64:
+        set_global_blob_encoding('base64')
+
     try:
         if args.list:
             result = do_list()
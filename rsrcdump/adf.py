@@ -1,23 +1,25 @@
 from typing import Final
 
-from io import BytesIO
-from struct import pack
-
-from rsrcdump.packutils import Unpacker, WritePlaceholder
+from struct import Struct
 
 ADF_MAGIC: Final   = 0x00051607
 ADF_VERSION: Final = 0x00020000
 ADF_ENTRYNUM_RESOURCEFORK: Final = 2
 
+ADF_HEADER: Final = Struct(">LL16sH")   # magic, version, filler, number of entries
+ADF_ENTRY: Final  = Struct(">LLL")      # entry ID, offset, length
+
 
 class NotADFError(ValueError):
     pass
 
 
-def unpack_adf(adf_data: bytes) -> dict[int, bytes]:
-    u = Unpacker(adf_data)
+def is_adf(data: bytes) -> bool:
+    return len(data) >= ADF_HEADER.size and data[:4] == ADF_MAGIC.to_bytes(4, 'big')
 
-    magic, version, filler, num_entries = u.unpack(">LL16sH")
+
+def unpack_adf(adf_data: bytes) -> dict[int, bytes]:
+    magic, version, filler, num_entries = ADF_HEADER.unpack_from(adf_data, 0)
 
     if ADF_MAGIC != magic:
         raise NotADFError("AppleDouble magic number not found")
@@ -25,46 +27,38 @@ def unpack_adf(adf_data: bytes) -> dict[int, bytes]:
     if ADF_VERSION != version:
         raise NotImplementedError(f"Only Version 2 ADF is supported (this is version {version:08x})")
 
-    entry_offsets = []
-
-    for _ in range(num_entries):
-        entry_offsets.append(u.unpack(">LLL"))
-
     entries = {0: filler}  # Entry #0 is invalid -- use it for the filler
 
-    for entry_id, offset, length in entry_offsets:
-        u.seek(offset)
-        entries[entry_id] = u.read(length)
+    entry_table = adf_data[ADF_HEADER.size : ADF_HEADER.size + ADF_ENTRY.size * num_entries]
+    assert len(entry_table) == ADF_ENTRY.size * num_entries, "ADF entry table is truncated"
+
+    for entry_id, offset, length in ADF_ENTRY.iter_unpack(entry_table):
+        entry_data = adf_data[offset : offset + length]
+        assert len(entry_data) == length
+        entries[entry_id] = entry_data
 
     return entries
 
 
 def pack_adf(adf_entries: dict[int, bytes]) -> bytes:
-    has_fake_entry0 = 0 in adf_entries
-
     filler = adf_entries.get(0, b'\0'*16)
     assert len(filler) == 16
 
-    num_entries = len(adf_entries)
-    if has_fake_entry0:
-        num_entries -= 1
+    # Entry #0 is the filler, not an actual entry
+    entries = [(entry_num, entry_data) for entry_num, entry_data in adf_entries.items() if entry_num != 0]
 
-    stream = BytesIO()
-    stream.write(pack(">LL16sH", ADF_MAGIC, ADF_VERSION, filler, num_entries))
+    # All sizes are known up front, so lay out the entire file in a single buffer
+    data_offset = ADF_HEADER.size + ADF_ENTRY.size * len(entries)
+    buf = bytearray(data_offset + sum(len(entry_data) for _, entry_data in entries))
 
-    wp_offsets = {}
+    ADF_HEADER.pack_into(buf, 0, ADF_MAGIC, ADF_VERSION, filler, len(entries))
 
-    for entry_num, entry_data in adf_entries.items():
-        if entry_num == 0:
-            continue
-        stream.write(pack(">L", entry_num))
-        wp_offsets[entry_num] = WritePlaceholder(stream, ">L")
-        stream.write(pack(">L", len(entry_data)))
+    entry_offset = ADF_HEADER.size
+    for entry_num, entry_data in entries:
+        ADF_ENTRY.pack_into(buf, entry_offset, entry_num, data_offset, len(entry_data))
+        entry_offset += ADF_ENTRY.size
 
-    for entry_num, entry_data in adf_entries.items():
-        if entry_num == 0:
-            continue
-        wp_offsets[entry_num].commit(stream.tell())
-        stream.write(entry_data)
+        buf[data_offset : data_offset + len(entry_data)] = entry_data
+        data_offset += len(entry_data)
 
-    return stream.getvalue()
+    return bytes(buf)
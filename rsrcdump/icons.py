@@ -1,74 +1,47 @@
-from typing import Callable
-
-from io import BytesIO
 from struct import pack
 
-from rsrcdump.packutils import Unpacker
 from rsrcdump.palettes import clut4, clut8
 
+# Lookup tables that expand an input byte to the BGRA pixels it encodes,
+# so that an entire icon can be converted with a single join.
+bgra_lut_8bit = [pack("<L", clut8[byte]) for byte in range(256)]
+bgra_lut_4bit = [pack("<LL", clut4[byte >> 4], clut4[byte & 0x0F]) for byte in range(256)]
+bgra_lut_1bit = [
+    b"".join(b"\x00\x00\x00\xFF" if byte & (0x80 >> bit) else b"\xFF\xFF\xFF\xFF" for bit in range(8))
+    for byte in range(256)
+]
+alpha_lut_1bit = [
+    bytes(0xFF if byte & (0x80 >> bit) else 0x00 for bit in range(8))
+    for byte in range(256)
+]
+
 def convert_icon_to_bgra(bw_mask: bytes, width: int, height: int,
-                         get_pixel: Callable[[int, int], int]) -> bytes:
-    icon = BytesIO()
-    u_mask = Unpacker(bw_mask)
+                         bgra: bytes) -> bytes:
+    assert len(bgra) == 4 * width * height, "icon data is too short"
 
-    for y in range(height):
-        if not bw_mask:
-            scanline_mask = 0xFFFFFFFF
-        elif width == 32:
-            scanline_mask, = u_mask.unpack(">L")
-        elif width == 16:
-            scanline_mask, = u_mask.unpack(">H")
-        else:
-            assert False, "unsupported width"
+    if not bw_mask:
+        return bgra
 
-        for x in range(width):
-            argb = get_pixel(x, y)
-            opaque = scanline_mask & (1 << (width - 1 -x))
-            if not opaque:
-                argb &= 0x00FFFFFF
-            icon.write(pack("<L", argb))
+    assert width in (16, 32), "unsupported width"
+    mask_length = width * height // 8
+    assert len(bw_mask) >= mask_length, "icon mask is too short"
 
-    return icon.getvalue()
+    # All palette colors are opaque, so the mask alone determines the alpha channel.
+    icon = bytearray(bgra)
+    icon[3::4] = b"".join(map(alpha_lut_1bit.__getitem__, bw_mask[:mask_length]))
+    return bytes(icon)
 
 def convert_8bit_icon_to_bgra(color_icon: bytes, bw_mask: bytes,
                               width: int, height: int) -> bytes:
-    def getpixel8(x: int, y: int) -> int:
-        pixel: int = color_icon[y * width + x]
-        return clut8[pixel]
-    return convert_icon_to_bgra(bw_mask, width, height, getpixel8)
+    bgra = b"".join(map(bgra_lut_8bit.__getitem__, color_icon[:width * height]))
+    return convert_icon_to_bgra(bw_mask, width, height, bgra)
 
 def convert_4bit_icon_to_bgra(color_icon: bytes, bw_mask: bytes,
                               width: int, height: int) -> bytes:
-    def getpixel4(x: int, y: int) -> int:
-        pixel: int = color_icon[y * (width>>1) + (x>>1)]
-        if 0 == (x & 1):
-            pixel >>= 4
-        pixel &= 0x0F
-        return clut4[pixel]
-    return convert_icon_to_bgra(bw_mask, width, height, getpixel4)
+    bgra = b"".join(map(bgra_lut_4bit.__getitem__, color_icon[:width * height // 2]))
+    return convert_icon_to_bgra(bw_mask, width, height, bgra)
 
 def convert_1bit_icon_to_bgra(bw_data: bytes, bw_mask: bytes,
                               width: int, height: int) -> bytes:
-    icon = BytesIO()
-    u_data = Unpacker(bw_data)
-    u_mask = Unpacker(bw_mask)
-
-    for y in range(height):
-        if width == 32:
-            scanline_data, = u_data.unpack(">L")
-            scanline_mask, = u_mask.unpack(">L")
-        elif width == 16:
-            scanline_data, = u_data.unpack(">H")
-            scanline_mask, = u_mask.unpack(">H")
-        else:
-            assert False, "unsupported width"
-
-        for x in range(width):
-            is_black = scanline_data & (1 << (width - 1 - x))
-            opaque = scanline_mask & (1 << (width - 1 - x))
-            argb = 0xFF000000 if is_black else 0xFFFFFFFF
-            if not opaque:
-                argb &= 0x00FFFFFF
-            icon.write(pack("<L", argb))
-
-    return icon.getvalue()
+    bgra = b"".join(map(bgra_lut_1bit.__getitem__, bw_data[:width * height // 8]))
+    return convert_icon_to_bgra(bw_mask, width, height, bgra)
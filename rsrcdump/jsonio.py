@@ -1,20 +1,36 @@
 from typing import Any
 
-import base64
+from os import PathLike
 import os
 import json
 
-from rsrcdump.resconverters import ResourceConverter, Base16Converter
-from rsrcdump.textio import get_global_encoding, sanitize_type_name, sanitize_resource_name, parse_type_name
+from rsrcdump.resconverters import ResourceConverter, base16_converter
+from rsrcdump.textio import get_global_encoding, sanitize_type_name, sanitize_resource_name, parse_type_name, \
+    get_global_blob_encoding, scoped_blob_encoding, encode_blob, decode_blob
 from rsrcdump.resfork import Resource, ResourceFork
 
 
-class JSONEncoderBase16Fallback(json.JSONEncoder):
+def write_file(path: str, data: bytes) -> None:
+    """ Writes data to a new file with raw OS calls, skipping Python's buffered I/O layer. """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+class JSONEncoderBlobFallback(json.JSONEncoder):
     def default(self, o: Any):
-        if isinstance(o, bytes):
-            return base64.b16encode(o).decode('ascii')
+        if isinstance(o, (bytes, bytearray, memoryview)):
+            return encode_blob(o)
         else:
-            return JSONEncoderBase16Fallback(self, o)
+            return super().default(o)
+
+
+# Former name, kept for existing callers
+JSONEncoderBase16Fallback = JSONEncoderBlobFallback
 
 
 def resource_fork_to_json(
@@ -33,34 +49,49 @@ def resource_fork_to_json(
         'file_attributes': fork.file_attributes
     }}
 
+    # Tell json_to_resource_fork how to decode binary data if it isn't plain hex
+    if get_global_blob_encoding() != 'base16':
+        json_blob['_metadata']['blob_encoding'] = get_global_blob_encoding()
+
     if metadata:
         json_blob['_metadata'].update(metadata)
 
     errors = []
 
+    # Hashed lookups for the type filters
+    include_types = frozenset(include_types)
+    exclude_types = frozenset(exclude_types)
+
     for res_type, res_dir in fork.tree.items():
         res_type_key = res_type.decode(get_global_encoding(), 'backslashreplace')
+        res_type_str = res_type.decode(get_global_encoding(), 'replace')
 
         if res_type in exclude_types:
             continue
         if include_types and res_type not in include_types:
             continue
 
-        json_blob[res_type_key] = {}
-
-        converter = converters.get(res_type, Base16Converter())
+        converter = converters.get(res_type, base16_converter)
+        converter_unpack = converter.unpack
+        converter_ext = converter.separate_file
+        converter_json_key = converter.json_key
 
         res_dirname = sanitize_type_name(res_type)
         res_dirpath = os.path.join(outpath + "_resources", res_dirname)
+        res_dir_created = False
+        res_entries = {}
 
         for res_id, res in res_dir.items():
+            # Decode the name once; it's needed for the listing, the JSON entry and the filename
+            res_name_str = res.name_str if res.name else ""
+
             if not quiet:
-                print(F"{res.type_str:4} {res.num:6} {len(res.data):8}  {res.name_str}")
+                print(F"{res_type_str:4} {res.num:6} {len(res.data):8}  {res_name_str}")
 
             wrapper: dict[str, Any] = {}
 
-            if res.name:
-                wrapper['name'] = res.name_str
+            if res_name_str:
+                wrapper['name'] = res_name_str
 
             if res.flags != 0:
                 wrapper['flags'] = res.flags
@@ -72,22 +103,24 @@ def resource_fork_to_json(
                 wrapper['order'] = res.order
 
             try:
-                obj = converter.unpack(res, fork)
-                separate_file = bool(converter.separate_file)
+                obj = converter_unpack(res, fork)
+                separate_file = bool(converter_ext)
             except BaseException as convert_exception:
                 errors.append(f"Failed to convert {res_type_key} #{res_id}: {convert_exception}")
                 if not quiet:
                     print("!!!", errors[-1])
                 wrapper['conversion_error'] = str(convert_exception)
                 # Fall back to base16
-                obj = Base16Converter().unpack(res, fork)
+                obj = base16_converter.unpack(res, fork)
                 separate_file = False
 
             if separate_file:
-                ext = converter.separate_file
-                os.makedirs(res_dirpath, exist_ok=True)
-                if res.name:
-                    sanitized_name = sanitize_resource_name(res.name_str)
+                ext = converter_ext
+                if not res_dir_created:
+                    os.makedirs(res_dirpath, exist_ok=True)
+                    res_dir_created = True
+                if res_name_str:
+                    sanitized_name = sanitize_resource_name(res_name_str)
                 else:
                     sanitized_name = ""
                 if sanitized_name:
@@ -95,20 +128,31 @@ def resource_fork_to_json(
                 else:
                     filename = F"{res_id}{ext}"
                 wrapper['file'] = F"{res_dirname}/{filename}"
-                with open(os.path.join(res_dirpath, filename), 'wb') as extfile:
-                    extfile.write(obj)
+                write_file(os.path.join(res_dirpath, filename), obj)
             else:
-                wrapper[converter.json_key] = obj
-
-            json_blob[res_type_key][res_id] = wrapper
-
-    json_text = json.dumps(json_blob, indent='\t', cls=JSONEncoderBase16Fallback)
-
-    with open(outpath, 'wt', encoding='utf-8') as file:
-        file.write(json_text)
-
-        if not quiet:
-            print(F"Wrote \"{os.path.relpath(file.name, '.')}\"")
+                wrapper[converter_json_key] = obj
+
+            res_entries[res_id] = wrapper
+
+        # Don't emit empty type tables
+        if res_entries:
+            json_blob[res_type_key] = res_entries
+
+    # Stream the JSON straight to disk so we never hold the entire text in memory.
+    # Write it next to the destination first, so that a failure while encoding
+    # doesn't leave a truncated file in place of the index.
+    temp_path = outpath + ".tmp"
+    try:
+        with open(temp_path, 'wt', encoding='utf-8') as file:
+            json.dump(json_blob, file, indent='\t', cls=JSONEncoderBlobFallback)
+        os.replace(temp_path, outpath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    if not quiet:
+        print(F"Wrote \"{os.path.relpath(outpath, '.')}\"")
 
     # Repeat errors at end
     for error in errors:
@@ -122,51 +166,94 @@ def json_to_resource_fork(
         converters: dict[bytes, ResourceConverter],
         only_types: list[bytes] = [],
         skip_types: list[bytes] = [],
+        encoding: str | None = None,
 ) -> ResourceFork:
     assert isinstance(json_blob, dict)
 
+    if not encoding:
+        encoding = get_global_encoding()
+
     fork = ResourceFork()
 
     fork.file_attributes = json_blob['_metadata']['file_attributes']
     fork.junk_nextresmap = json_blob['_metadata']['junk1']
     fork.junk_filerefnum = json_blob['_metadata']['junk2']
 
-    for type_name, type_records in json_blob.items():
-        if len(type_name) > 4:  # probably metadata
-            continue
-
-        res_type = parse_type_name(type_name)
+    # Hashed lookups for the type filters
+    only_types = frozenset(only_types)
+    skip_types = frozenset(skip_types)
 
-        if (res_type in skip_types) or (only_types and res_type not in only_types):
-            continue
+    # Decode blobs as declared by this file without affecting later exports
+    with scoped_blob_encoding(get_json_blob_encoding(json_blob)):
+        for type_name, type_records in json_blob.items():
+            if len(type_name) > 4:  # probably metadata
+                continue
 
-        fork.tree[res_type] = {}
+            res_type = parse_type_name(type_name)
 
-        assert isinstance(type_records, dict)
-        converter = converters.get(res_type, Base16Converter())
+            if (res_type in skip_types) or (only_types and res_type not in only_types):
+                continue
 
-        for res_id_str, res_blob in type_records.items():
-            assert isinstance(res_blob, dict)
+            fork.tree[res_type] = {}
 
-            res_num = int(res_id_str)
-            res_name = res_blob.get("name", "").encode(get_global_encoding(), 'replace')
-            res_flags = res_blob.get("flags", 0)
-            res_junk = res_blob.get("junk", 0)
-            res_order = res_blob.get("order", -1)
+            assert isinstance(type_records, dict)
+            converter = converters.get(res_type, base16_converter)
+            json_key = converter.json_key
+            res_dir = fork.tree[res_type]
 
-            data_blob = res_blob.get(converter.json_key, None)
-            res_data = converter.pack(data_blob)
+            for res_id_str, res_blob in type_records.items():
+                assert isinstance(res_blob, dict)
 
-            res = Resource(
-                type=res_type,
-                num=res_num,
-                data=res_data,
-                name=res_name,
-                flags=res_flags,
-                junk=res_junk,
-                order=res_order)
+                res_num = int(res_id_str)
+                res_name = res_blob.get("name")
+                res_name = res_name.encode(encoding, 'replace') if res_name else b''
+                res_data = converter.pack(res_blob.get(json_key, None))
 
-            fork.tree[res_type][res_num] = res
+                res_dir[res_num] = Resource(
+                    type=res_type,
+                    num=res_num,
+                    data=res_data,
+                    name=res_name,
+                    flags=res_blob.get("flags", 0),
+                    junk=res_blob.get("junk", 0),
+                    order=res_blob.get("order", -1))
 
     return fork
 
+
+def get_json_blob_encoding(json_blob: dict) -> str:
+    """ Returns the blob encoding that a JSON file produced by resource_fork_to_json was written with. """
+    # Files that predate the blob_encoding marker are always base-16
+    return json_blob['_metadata'].get('blob_encoding', 'base16')
+
+
+def json_to_adf_entries(json_blob: dict) -> dict[int, bytes]:
+    """ Decodes the AppleDouble entries that resource_fork_to_json stored in the metadata, if any. """
+    adf_entries = {}
+    adf_metadata = json_blob['_metadata'].get('adf', {})
+    with scoped_blob_encoding(get_json_blob_encoding(json_blob)):
+        for adf_entry_id, adf_entry_blob in adf_metadata.items():
+            adf_entries[int(adf_entry_id)] = decode_blob(adf_entry_blob)
+    return adf_entries
+
+
+def load_resource_fork_from_json(
+        path: str | PathLike,
+        converters: dict[bytes, ResourceConverter],
+        only_types: list[bytes] = [],
+        skip_types: list[bytes] = [],
+        encoding: str | None = None,
+) -> tuple[ResourceFork, dict[int, bytes]]:
+    """ Reads a JSON file produced by resource_fork_to_json and converts it back to a ResourceFork.
+    Also returns the AppleDouble entries (other than the resource fork) recorded in the file's metadata. """
+
+    # Hand the raw bytes to the parser so the text isn't decoded through a TextIOWrapper first
+    with open(path, 'rb') as file:
+        json_blob = json.loads(file.read())
+
+    # We've got to convert the json_blob to ResMap
+    assert isinstance(json_blob, dict)
+
+    fork = json_to_resource_fork(json_blob, converters, only_types, skip_types, encoding)
+    adf_entries = json_to_adf_entries(json_blob)
+    return fork, adf_entries
@@ -1,19 +1,48 @@
-from typing import Any
+from typing import Any, Iterator
 
+from contextlib import contextmanager
 from io import BytesIO
+from os import PathLike
+import mmap
 import struct
 
+struct_cache: dict[str, struct.Struct] = {}
+
+def get_struct(fmt: str) -> struct.Struct:
+    """ Returns a compiled Struct for the given format string, compiling it on first use only. """
+    compiled = struct_cache.get(fmt)
+    if compiled is None:
+        compiled = struct_cache[fmt] = struct.Struct(fmt)
+    return compiled
+
 class Unpacker:
-    def __init__(self, data: bytes, offset: int=0) -> None:
+    __slots__ = ('data', 'offset')
+
+    def __init__(self, data: bytes | memoryview, offset: int=0) -> None:
         self.data = data
         self.offset = offset
 
     def unpack(self, fmt: str) -> tuple:
-        record_length = struct.calcsize(fmt)
-        fields = struct.unpack_from(fmt, self.data, self.offset)
-        self.offset += record_length
+        compiled = get_struct(fmt)
+        fields = compiled.unpack_from(self.data, self.offset)
+        self.offset += compiled.size
         return fields
 
+    def unpack_struct(self, compiled: struct.Struct) -> tuple:
+        """ Same as unpack, but with a Struct that the caller compiled ahead of time. """
+        fields = compiled.unpack_from(self.data, self.offset)
+        self.offset += compiled.size
+        return fields
+
+    def iter_unpack(self, fmt: str, count: int) -> Iterator[tuple]:
+        """ Unpacks `count` consecutive records of the same format with a single bounds check. """
+        compiled = get_struct(fmt)
+        size = compiled.size * count
+        records = self.data[self.offset : self.offset + size]
+        assert len(records) == size
+        self.offset += size
+        return compiled.iter_unpack(records)
+
     def seek(self, offset: int):
         self.offset = offset
 
@@ -24,16 +53,19 @@ class Unpacker:
         data_slice = self.data[self.offset : self.offset + size]
         assert len(data_slice) == size
         self.offset += size
-        return data_slice
+        # Slicing a memoryview is free, so this is the only copy made (and a no-op if data is already bytes)
+        return bytes(data_slice)
 
     def unpack_raw_pstr(self) -> bytes:
-        length, = self.unpack(">B")
-        return self.read(length)
+        length = self.data[self.offset]
+        start = self.offset + 1
+        binary_pstr = self.data[start : start + length]
+        assert len(binary_pstr) == length
+        self.offset = start + length
+        return bytes(binary_pstr)
 
     def unpack_pstr(self, encoding: str = 'macroman', errors: str = 'replace') -> str:
-        length, = self.unpack(">B")
-        binary_pstr = self.read(length)
-        return binary_pstr.decode(encoding, errors)
+        return self.unpack_raw_pstr().decode(encoding, errors)
 
     def eof(self) -> bool:
         return self.offset >= len(self.data)
@@ -42,20 +74,21 @@ class Unpacker:
         return len(self.data) - self.offset
 
 class WritePlaceholder:
+    __slots__ = ('stream', 'fmt', 'struct', 'position', 'committed')
+
     def __init__(self, stream: BytesIO, fmt: str) -> None:
         self.stream = stream
         self.fmt = fmt
+        self.struct = get_struct(fmt)
         self.position = self.stream.tell()
-        self.stream.write(b'\xCA' * struct.calcsize(fmt))
+        self.stream.write(b'\xCA' * self.struct.size)
         self.committed = False
 
     def commit(self, value: Any) -> None:
         assert not self.committed, "Already committed"
-        position_backup = self.stream.tell()
-        data = struct.pack(self.fmt, value)
-        self.stream.seek(self.position)
-        self.stream.write(data)
-        self.stream.seek(position_backup)
+        # Patch the placeholder in place; the view must be released before the stream can grow again
+        with self.stream.getbuffer() as view:
+            self.struct.pack_into(view, self.position, value)
         self.committed = True
 
     def __del__(self) -> None:
@@ -64,7 +97,40 @@ class WritePlaceholder:
 
 def pack_pstr(text: str, padding: int, encoding: str='macroman') -> bytes:
     bintext = text.encode(encoding)
-    buf = struct.pack(">B", len(bintext)) + bintext
-    pad_count = (1 + len(bintext)) % padding
-    buf += b'\0' * pad_count
-    return buf
+    length = len(bintext)
+    assert length < 256, "string too long for a pstr"
+    total = 1 + length
+    buf = bytearray(total + (-total) % padding)
+    buf[0] = length
+    buf[1:total] = bintext
+    return bytes(buf)
+
+@contextmanager
+def map_file(path: str | PathLike) -> Iterator[bytes | mmap.mmap]:
+    """
+    Maps a file into memory for reading, so that large files don't need to be copied into a bytes object.
+    Falls back to reading the entire file if it can't be mapped (e.g. empty files, or macOS named forks).
+    """
+    with open(path, 'rb') as file:
+        try:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            mapping = None
+
+        if mapping is None:
+            yield file.read()
+            return
+
+        try:
+            yield mapping
+        except BaseException:
+            try:
+                mapping.close()
+            except BufferError:
+                # The traceback may still hold memoryviews into the mapping.
+                # Don't mask the original error; the mapping is unmapped once the views are collected.
+                pass
+            raise
+
+        # On success, a view that outlives the block is a bug, so let BufferError surface
+        mapping.close()
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import array
 import enum
-import io
+import functools
 import struct
+import sys
 from ctypes import ArgumentError
 from dataclasses import dataclass
 
@@ -354,68 +356,82 @@ class Pixmap(Xmap):
     pmtable: int
 
 
-def unpack_bits(slice: bytes, packfmt: str, rowbytes: int) -> list[int]:
-    unpacked = []
+# Precompiled formats for the records read most often while walking a PICT
+ubyte_struct = struct.Struct(">B")
+ushort_struct = struct.Struct(">H")
+rect_struct = struct.Struct(">4h")
 
-    u = Unpacker(slice)
-    while not u.eof():
-        flag = u.unpack(">B")[0]
+
+def unpack_bits_into(unpacked: bytearray, slice: bytes | memoryview, itemsize: int) -> None:
+    """ Decodes a PackBits scanline and appends the result to `unpacked`.
+    Runs are made of 1-byte or 2-byte items; either way they can be copied as raw bytes. """
+    i = 0
+    end = len(slice)
+    while i < end:
+        flag = slice[i]
+        i += 1
 
         if flag == 128:  # Apple says ignore
             pass
         elif flag > 128:  # packed data
             stride = 1 + 256-flag
-            item = u.unpack(packfmt)[0]
-            unpacked.extend([item] * stride)
+            unpacked += bytes(slice[i : i + itemsize]) * stride
+            i += itemsize
         else:  # unpacked data
-            stride = flag + 1
-            for _ in range(stride):
-                item = u.unpack(packfmt)[0]
-                unpacked.append(item)
+            run_length = (flag + 1) * itemsize
+            unpacked += slice[i : i + run_length]
+            i += run_length
 
-    return unpacked
+    if i > end:
+        raise PICTError("unpack_bits_into: truncated run")
 
 
-def unpack_all_rows(u: Unpacker, packfmt: str, numrows: int, rowbytes: int) -> list[int]:
+def unpack_all_rows(u: Unpacker, packfmt: str, numrows: int, rowbytes: int) -> bytes:
     # Data is unpacked if rowbytes < 8 (IM:QD A-15)
     if rowbytes < 8:
         assert packfmt == ">B"
-        return list(u.read(rowbytes * numrows))
-
-    data = []
+        return u.read(rowbytes * numrows)
+
+    # Decode all scanlines back-to-back into a single buffer.
+    # Packed scanlines are sliced out of a view of the input so they don't get copied on the way in.
+    itemsize = struct.calcsize(packfmt)
+    packed = memoryview(u.data)
+    unpacked = bytearray()
+    # unpack scanline (IM:QD, page A-5): byte count is a short if rowbytes > 250
+    count_struct = ushort_struct if rowbytes > 250 else ubyte_struct
     for y in range(numrows):
-        # unpack scanline (IM:QD, page A-5)
-        if rowbytes > 250:
-            packed_rowbytes = u.unpack(">H")[0]
-        else:
-            packed_rowbytes = u.unpack(">B")[0]
-        rowpixels = unpack_bits(u.read(packed_rowbytes), packfmt, rowbytes)
-        data.extend(rowpixels)
-    return data
+        packed_rowbytes, = u.unpack_struct(count_struct)
+        scanline = packed[u.offset : u.offset + packed_rowbytes]
+        assert len(scanline) == packed_rowbytes
+        u.skip(packed_rowbytes)
+        unpack_bits_into(unpacked, scanline, itemsize)
+    return unpacked
+
+
+# Expands a 1-bit byte to its 8 black or white BGRA pixels
+bgra_lut_1bit = [
+    b"".join(b"\x00\x00\x00\xFF" if byte & (0x80 >> bit) else b"\xFF\xFF\xFF\xFF" for bit in range(8))
+    for byte in range(256)
+]
 
 
 def unpackbw(u: Unpacker, bm: Bitmap) -> bytes:
     unpacked = unpack_all_rows(u, ">B", numrows=bm.height, rowbytes=bm.rowbytes)
-    dst = io.BytesIO()
-    for y in range(bm.height):
-        for x in range(bm.width):
-            byteno = y*bm.rowbytes + x//8
-            bitno = 7 - (x % 8)
-            black = 0 != (((unpacked[byteno]) >> bitno) & 1)
-            if black:
-                dst.write(b'\x00\x00\x00\xFF')
-            else:
-                dst.write(b'\xFF\xFF\xFF\xFF')
-    return dst.getvalue()
+    if len(unpacked) < bm.rowbytes * bm.height:
+        raise PICTError("unpackbw: unexpected item count")
+
+    # Expand each byte to 8 BGRA pixels in one lookup, then cut off the padding bits at the end of each row
+    row_length = 4 * bm.width
+    return b"".join(
+        b"".join(map(bgra_lut_1bit.__getitem__, unpacked[y*bm.rowbytes : (y+1)*bm.rowbytes]))[:row_length]
+        for y in range(bm.height))
 
 
 def unpack0(u: Unpacker, pm: Pixmap, palette: list[bytes]) -> bytes:
-    unpacked = bytes(unpack_all_rows(u, ">B", numrows=pm.height, rowbytes=pm.rowbytes))
+    unpacked = unpack_all_rows(u, ">B", numrows=pm.height, rowbytes=pm.rowbytes)
     assert len(unpacked) == pm.rowbytes * pm.height
 
-    pixels8 = convert_to_8bit(unpacked, pm.pixelsize)
-    pixels8 = trim_excess_columns_8bit(pixels8, pm)
-    return convert_indexed_8bit_to_32bit(pixels8, palette)
+    return convert_indexed_to_32bit(unpacked, pm, palette)
 
 
 # Unpack pixel type 1 (8 bits, no packing)
@@ -423,9 +439,15 @@ def unpack1(u: Unpacker, pm: Pixmap, palette: list[bytes]) -> bytes:
     unpacked = u.read(pm.rowbytes * pm.height)
     assert len(unpacked) == pm.rowbytes * pm.height
 
-    pixels8 = convert_to_8bit(unpacked, pm.pixelsize)
-    pixels8 = trim_excess_columns_8bit(pixels8, pm)
-    return convert_indexed_8bit_to_32bit(pixels8, palette)
+    return convert_indexed_to_32bit(unpacked, pm, palette)
+
+
+@functools.cache
+def get_rgb555_lut() -> list[bytes]:
+    """ Maps every 16-bit xRGB pixel to its BGRA bytes. Built on first use since it has 65536 entries. """
+    lut5 = [int(c * (255.0/31.0)) for c in range(32)]
+    lut = [bytes((b, g, r, 0xFF)) for r in lut5 for g in lut5 for b in lut5]
+    return lut * 2  # the top bit is unused
 
 
 # Unpack pixel type 3 (16 bits, chunky)
@@ -434,20 +456,18 @@ def unpack3(u: Unpacker, w: int, h: int, rowbytes: int) -> bytes:
     assert w * 2 <= rowbytes
 
     unpacked = unpack_all_rows(u, ">H", h, rowbytes)
-    if len(unpacked) != h * (rowbytes//2):
+    if len(unpacked) != h * rowbytes:
         raise PICTError("unpack3: unexpected item count")
 
-    dst = io.BytesIO()
-    for y in range(h):
-        rowoffset = y * (rowbytes//2)
-        for x in range(w):
-            p = unpacked[rowoffset + x]
-            a = 0xFF
-            r = int(((p >> 10) & 0b11111) * (255.0/31.0))
-            g = int(((p >>  5) & 0b11111) * (255.0/31.0))
-            b = int(((p >>  0) & 0b11111) * (255.0/31.0))
-            dst.write(struct.pack(">4B", b,g,r,a))
-    return dst.getvalue()
+    pixels = array.array('H', unpacked)
+    if sys.byteorder == 'little':
+        pixels.byteswap()
+
+    lut = get_rgb555_lut()
+    stride = rowbytes // 2
+    return b"".join(
+        b"".join(map(lut.__getitem__, pixels[y*stride : y*stride + w]))
+        for y in range(h))
 
 
 # Unpack pixel type 4 (24 or 32 bits, planar)
@@ -455,33 +475,33 @@ def unpack4(u: Unpacker, w: int, h: int, rowbytes: int, numplanes: int) -> bytes
     unpacked = unpack_all_rows(u, ">B", h, rowbytes)
     if len(unpacked) != numplanes*w*h:
         raise PICTError("unpack4: unexpected item count")
-    dst = io.BytesIO()
+
+    # Each row holds one run of w bytes per plane: (A,) R, G, B.
+    # Scatter every run into its BGRA channel with a single strided slice assignment.
     if numplanes == 3:
-        for y in range(h):
-            for x in range(w):
-                a = 0xFF
-                r = unpacked[y*w*3 + x + w*0]
-                g = unpacked[y*w*3 + x + w*1]
-                b = unpacked[y*w*3 + x + w*2]
-                dst.write(struct.pack(">BBBB", b,g,r,a))
+        channels = (2, 1, 0)
+    elif numplanes == 4:
+        channels = (3, 2, 1, 0)
     else:
-        for y in range(h):
-            for x in range(w):
-                a = unpacked[y*w*3 + x + w*0]
-                r = unpacked[y*w*3 + x + w*1]
-                g = unpacked[y*w*3 + x + w*2]
-                b = unpacked[y*w*3 + x + w*3]
-                dst.write(struct.pack(">BBBB", b,g,r,a))
-    return dst.getvalue()
+        raise PICTError(F"unpack4: unsupported plane count {numplanes}")
+
+    dst = bytearray(b'\xFF' * (4*w*h))
+    for y in range(h):
+        row_start = y * numplanes * w
+        dst_start = y * 4 * w
+        for plane, channel in enumerate(channels):
+            plane_start = row_start + plane*w
+            dst[dst_start + channel : dst_start + 4*w : 4] = unpacked[plane_start : plane_start + w]
+    return bytes(dst)
 
 
 def read_bitmap_or_pixmap(u: Unpacker) -> Bitmap | Pixmap:
-    rowbytes_flag = u.unpack(">H")[0]
+    rowbytes_flag, = u.unpack_struct(ushort_struct)
     rowbytes = rowbytes_flag & 0x7FFF
     is_pixmap = 0 != (rowbytes_flag & 0x8000)
     if is_pixmap:
         return Pixmap(rowbytes, *u.unpack("> 4h hh i ii hhhh i i 4x"))
-    return Bitmap(rowbytes, *u.unpack("> 4h"))
+    return Bitmap(rowbytes, *u.unpack_struct(rect_struct))
 
 
 def read_colortable(u: Unpacker) -> list[bytes]:
@@ -496,8 +516,7 @@ def read_colortable(u: Unpacker) -> list[bytes]:
     alreadyset = [False] * 256
     illegalcolors = set()
 
-    for i in range(numcolors):
-        colorindex = u.unpack(">H")[0]
+    for i, (colorindex, r, g, b) in enumerate(u.iter_unpack(">HHHH", numcolors)):
         if colorindex >= 256:
             if colorindex not in illegalcolors:
                 print(F"!!! illegal color index ${colorindex:04x} in palette definition")  
@@ -508,50 +527,62 @@ def read_colortable(u: Unpacker) -> list[bytes]:
         if alreadyset[colorindex]:
             print(F"!!! color {colorindex} overwritten")
         alreadyset[colorindex] = True
-        r,g,b = u.unpack(">HHH")
         r >>= 8
         g >>= 8
         b >>= 8
         a = 0xFF
-        palette[colorindex] = struct.pack(">BBBB", b,g,r,a)
+        palette[colorindex] = bytes((b, g, r, a))
     
     return palette
 
 
+# Flips every bit of a byte (XOR 0xFF)
+invert_table = bytes(range(255, -1, -1))
+
+
 def unpack_maskrgn(rect: PICTRect, mask: bytes) -> bytes:
-    out = io.BytesIO()
+    out = bytearray()
     u = Unpacker(mask)
 
     lastrow = rect.top
-    scanline = [0x00] * rect.width
+    scanline = bytearray(rect.width)
 
     while not u.eof():
-        row = u.unpack(">H")[0]
+        row, = u.unpack_struct(ushort_struct)
 
         if row == 0x7FFF:
             break
 
-        for repeat in range(row-lastrow):
-            out.write(bytes(scanline))
+        out += bytes(scanline) * (row-lastrow)
 
         while True:
-            left = u.unpack(">H")[0]
+            left, = u.unpack_struct(ushort_struct)
             if left == 0x7FFF:
                 break
-            right = u.unpack(">H")[0]
+            right, = u.unpack_struct(ushort_struct)
             assert right != 0x7FFF
-            for x in range(left, right):
-                scanline[x - rect.left] ^= 0xFF
+            x0 = left - rect.left
+            x1 = right - rect.left
+            assert 0 <= x0 and x1 <= rect.width, "mask region span out of bounds"
+            scanline[x0:x1] = scanline[x0:x1].translate(invert_table)
         
         lastrow = row
     
-    buf = out.getvalue()
-    assert len(buf) == rect.width * rect.height
-    return buf
+    assert len(out) == rect.width * rect.height
+    return bytes(out)
+
+
+# Opcode groups for hashed membership tests in the opcode loop
+bits_opcodes = frozenset({Op.BitsRect, Op.BitsRgn,
+                          Op.PackBitsRect, Op.PackBitsRgn,
+                          Op.DirectBitsRect, Op.DirectBitsRgn})
+direct_bits_opcodes = frozenset({Op.DirectBitsRect, Op.DirectBitsRgn})
+rgn_bits_opcodes = frozenset({Op.BitsRgn, Op.PackBitsRgn, Op.DirectBitsRgn})
+quietly_skipped_opcodes = frozenset({Op.LongComment, Op.LongText, Op.ShortComment, Op.DefHilite})
 
 
 def read_pict_bits(u: Unpacker, opcode: int) -> tuple[PICTRect, bytes]:
-    direct_bits_opcode = opcode in (Op.DirectBitsRect, Op.DirectBitsRgn)
+    direct_bits_opcode = opcode in direct_bits_opcodes
 
     # Skip junk pointer at beginning of DirectBitsRect/DirectBitsRgn
     if direct_bits_opcode:
@@ -566,8 +597,8 @@ def read_pict_bits(u: Unpacker, opcode: int) -> tuple[PICTRect, bytes]:
         palette = read_colortable(u)
 
     # Read src/dst rectangles
-    src_rect = PICTRect(*u.unpack(">4h"))
-    dst_rect = PICTRect(*u.unpack(">4h"))
+    src_rect = PICTRect(*u.unpack_struct(rect_struct))
+    dst_rect = PICTRect(*u.unpack_struct(rect_struct))
     if src_rect.width != dst_rect.width or src_rect.height != dst_rect.height:
         print(F"!!! unsupported src/dst rects; s={src_rect} d={dst_rect} f={raster.frame_rect}")
 
@@ -578,10 +609,10 @@ def read_pict_bits(u: Unpacker, opcode: int) -> tuple[PICTRect, bytes]:
 
     # Read mask region, if any (xxxRgn opcodes)
     mask_8bit = None
-    if opcode in (Op.BitsRgn, Op.PackBitsRgn, Op.DirectBitsRgn):
+    if opcode in rgn_bits_opcodes:
         # IM:QD, page 2-7
-        maskrgn_size = u.unpack(">H")[0]
-        maskrgn_rect = PICTRect(*u.unpack(">4h"))
+        maskrgn_size, = u.unpack_struct(ushort_struct)
+        maskrgn_rect = PICTRect(*u.unpack_struct(rect_struct))
         maskrgn_bits = u.read(maskrgn_size - 4*2-2)
         if maskrgn_bits:
             mask_8bit = unpack_maskrgn(maskrgn_rect, maskrgn_bits)
@@ -607,61 +638,83 @@ def read_pixmap_image_data(u: Unpacker, raster: Bitmap | Pixmap, palette: list[b
         return unpackbw(u, raster)
     elif raster.packtype == 1 or raster.rowbytes < 8:
         return unpack1(u, raster, palette)
-    elif raster.packtype == 0:
-        return unpack0(u, raster, palette)
     elif raster.packtype == 2:
         raise PICTError("Packtype 2 isn't supported yet - it's so rare that I've never seen it in the wild. "
                         "Please open an issue on https://github.com/jorio/rsrcdump and attach the rsrc file. "
                         "Thank you!")
-    elif raster.packtype == 3:
-        return unpack3(u, raster.width, raster.height, raster.rowbytes)
-    elif raster.packtype == 4:
-        return unpack4(u, raster.width, raster.height, raster.rowbytes, raster.cmpcount)
-    raise PICTError(F"unsupported packtype {raster.packtype}")
-
-
-def get_reserved_opcode_size(k: int) -> int:
-    if 0x0035 <= k <= 0x0037: return 8
-    if 0x003D <= k <= 0x003F: return 0
-    if 0x0045 <= k <= 0x0047: return 8
-    if 0x004D <= k <= 0x004F: return 0
-    if 0x0055 <= k <= 0x0057: return 8
-    if 0x005D <= k <= 0x005F: return 0
-    if 0x0065 <= k <= 0x0067: return 12
-    if 0x006D <= k <= 0x006F: return 4
-    if 0x007D <= k <= 0x007F: return 0
-    if 0x008D <= k <= 0x008F: return 0
-    if 0x00B0 <= k <= 0x00CF: return 0
-    if 0x0100 <= k <= 0x01FF: return 2
-    if k == 0x0200: return 4
-    if k == 0x02FF: return 2
-    if k == 0x0BFF: return 22
-    if 0x0C00 <= k <= 0x7EFF: return 24
-    if 0x7F00 <= k <= 0x7FFF: return 254
-    if 0x8000 <= k <= 0x80FF: return 0
-    return -1
+
+    try:
+        decoder = packtype_decoders[raster.packtype]
+    except KeyError:
+        raise PICTError(F"unsupported packtype {raster.packtype}")
+    return decoder(u, raster, palette)
+
+
+# Pixmap decoders by packtype, all taking (u, pixmap, palette)
+packtype_decoders = {
+    0: unpack0,
+    1: unpack1,
+    3: lambda u, pm, palette: unpack3(u, pm.width, pm.height, pm.rowbytes),
+    4: lambda u, pm, palette: unpack4(u, pm.width, pm.height, pm.rowbytes, pm.cmpcount),
+}
+
+
+# Sizes of the data that follows reserved opcodes: (first opcode, last opcode, data size).
+# Expanded into a flat table below, indexed by opcode.
+reserved_opcode_ranges = [
+    (0x0035, 0x0037, 8),
+    (0x003D, 0x003F, 0),
+    (0x0045, 0x0047, 8),
+    (0x004D, 0x004F, 0),
+    (0x0055, 0x0057, 8),
+    (0x005D, 0x005F, 0),
+    (0x0065, 0x0067, 12),
+    (0x006D, 0x006F, 4),
+    (0x007D, 0x007F, 0),
+    (0x008D, 0x008F, 0),
+    (0x00B0, 0x00CF, 0),
+    (0x0100, 0x01FF, 2),
+    (0x0200, 0x0200, 4),
+    (0x02FF, 0x02FF, 2),
+    (0x0BFF, 0x0BFF, 22),
+    (0x0C00, 0x7EFF, 24),
+    (0x7F00, 0x7FFF, 254),
+    (0x8000, 0x80FF, 0),
+]
+
+
+def make_reserved_opcode_sizes() -> array.array:
+    """ Returns the data size for every possible opcode (-1 if the opcode isn't reserved). """
+    sizes = array.array('h', [-1]) * 0x10000
+    for first, last, size in reserved_opcode_ranges:
+        sizes[first : last + 1] = array.array('h', [size]) * (last + 1 - first)
+    return sizes
+
+
+reserved_opcode_sizes = make_reserved_opcode_sizes()
 
 
 def crop_32bit(src_data: bytes, src_rect: PICTRect, dst_rect: PICTRect):
     intersection = src_rect.intersect(dst_rect)
 
-    src_io = io.BytesIO(src_data)
-    dst_io = io.BytesIO()
-
     left_offset = intersection.left - src_rect.left
     assert left_offset >= 0, "negative left_offset when cropping!"
 
+    src_view = memoryview(src_data)
+    row_len = 4 * intersection.width
+    rows = []
+
     for y in range(intersection.height):
-        src_io.seek(4 * (y * src_rect.width + left_offset))
-        row_len = 4 * intersection.width
-        row = src_io.read(row_len)
+        src_start = 4 * (y * src_rect.width + left_offset)
+        row = src_view[src_start : src_start + row_len]
         assert len(row) == row_len
-        dst_io.write(row)
+        rows.append(row)
 
-    return dst_io.getvalue()
+    return b"".join(rows)
 
 
-def blit_32bit(src_rect: PICTRect, src_data: bytes, dst_rect: PICTRect, dst_data: bytes):
+def blit_32bit(src_rect: PICTRect, src_data: bytes, dst_rect: PICTRect, dst_data: bytearray) -> None:
+    """ Copies the overlapping part of src_data into dst_data, in place. """
     intersection = src_rect.intersect(dst_rect)
 
     src_dy, src_dx = intersection.top - src_rect.top, intersection.left - src_rect.left
@@ -669,20 +722,17 @@ def blit_32bit(src_rect: PICTRect, src_data: bytes, dst_rect: PICTRect, dst_data
     assert src_dy >= 0 and src_dx >= 0, "blit: negative src offset"
     assert dst_dy >= 0 and dst_dx >= 0, "blit: negative dst offset"
 
-    src_io = io.BytesIO(src_data)
-    dst_io = io.BytesIO(dst_data)
+    src_view = memoryview(src_data)
+    row_len = 4 * intersection.width
 
     for y in range(intersection.height):
-        src_io.seek(4 * ((src_dy + y) * src_rect.width + src_dx))
-        dst_io.seek(4 * ((dst_dy + y) * dst_rect.width + dst_dx))
+        src_start = 4 * ((src_dy + y) * src_rect.width + src_dx)
+        dst_start = 4 * ((dst_dy + y) * dst_rect.width + dst_dx)
 
-        row_len = 4 * intersection.width
-        row = src_io.read(row_len)
+        row = src_view[src_start : src_start + row_len]
         assert len(row) == row_len, "blit: underrun"
 
-        dst_io.write(row)
-
-    return dst_io.getvalue()
+        dst_data[dst_start : dst_start + row_len] = row
 
 
 def apply_8bit_mask_on_32bit_image(msk_rect: PICTRect, msk_data: bytes, dst_rect: PICTRect, dst_data: bytes):
@@ -693,21 +743,29 @@ def apply_8bit_mask_on_32bit_image(msk_rect: PICTRect, msk_data: bytes, dst_rect
     assert msk_dy >= 0 and msk_dx >= 0, "mask: negative msk offset"
     assert dst_dy >= 0 and dst_dx >= 0, "mask: negative dst offset"
 
-    msk_io = io.BytesIO(msk_data)
-    dst_io = io.BytesIO(dst_data)
+    dst = bytearray(dst_data)
+    row_len = intersection.width
 
     for y in range(intersection.height):
-        msk_io.seek(1 * ((msk_dy + y) * msk_rect.width + msk_dx))
-        dst_io.seek(4 * ((dst_dy + y) * dst_rect.width + dst_dx) + 3)  # +3: jump to alpha component in BGRA stream
+        msk_start = 1 * ((msk_dy + y) * msk_rect.width + msk_dx)
+        dst_start = 4 * ((dst_dy + y) * dst_rect.width + dst_dx) + 3  # +3: jump to alpha component in BGRA stream
 
-        for x in range(intersection.width):
-            opacity = msk_io.read(1)
-            assert len(opacity) == 1, "mask: underrun"
-            assert opacity in b"\x00\xFF"
-            dst_io.write(opacity)
-            dst_io.seek(3, io.SEEK_CUR)  # jump to alpha component in next pixel
+        opacity = msk_data[msk_start : msk_start + row_len]
+        assert len(opacity) == row_len, "mask: underrun"
+        assert not opacity.translate(None, b"\x00\xFF"), "mask: opacity must be 0x00 or 0xFF"
 
-    return dst_io.getvalue()
+        # Overwrite the alpha component of every pixel in the row at once
+        dst[dst_start : dst_start + 4*row_len : 4] = opacity
+
+    return bytes(dst)
+
+
+# Opcode names for diagnostics; looked up only when a message is actually printed
+opcode_names = {op.value: op.name for op in Op}
+
+
+def get_opcode_name(opcode: int) -> str:
+    return opcode_names.get(opcode) or f"${opcode:04x}"
 
 
 def convert_pict_to_image(data: bytes) -> tuple[int, int, bytes]:
@@ -717,10 +775,11 @@ def convert_pict_to_image(data: bytes) -> tuple[int, int, bytes]:
     v1_picture_size, = u.unpack(">H")  # Meaningless for "modern" picts that can easily exceed 65,535 bytes.
 
     # Get canvas dimensions
-    canvas_rect = PICTRect(*u.unpack(">4h"))
+    canvas_rect = PICTRect(*u.unpack_struct(rect_struct))
 
     # Initialize canvas pixels
-    canvas_32bit = b"\xFF\xFF\xFF\xFF" * (canvas_rect.width * canvas_rect.height)
+    # (mutable, so that every blit can draw into it without copying the whole canvas)
+    canvas_32bit = bytearray(b"\xFF\xFF\xFF\xFF" * (canvas_rect.width * canvas_rect.height))
 
     # Determine version
     if Op.picVersion == u.unpack(">B")[0]:
@@ -737,104 +796,94 @@ def convert_pict_to_image(data: bytes) -> tuple[int, int, bytes]:
             raise PICTError("bad PICT header")
         version = 2
 
+    # v1 opcodes are bytes, v2 opcodes are shorts
+    opcode_struct = ubyte_struct if version == 1 else ushort_struct
+
     while True:
         # align position to short (v2 PICT only)
         if version == 2 and 1 == (u.offset - start_offset) % 2:
             u.skip(1)
 
-        if version == 1:
-            opcode, = u.unpack(">B")
-        else:
-            opcode, = u.unpack(">H")
+        opcode, = u.unpack_struct(opcode_struct)
 
-        try:
-            opcode_name = Op(opcode).name
-        except ValueError:
-            opcode_name = f"${opcode:04x}"
-        # print(F"Opcode {opcode_name} at offset {u.offset}")
+        # print(F"Opcode {get_opcode_name(opcode)} at offset {u.offset}")
 
         # skip reserved opcodes
-        reserved_opcode_size = get_reserved_opcode_size(opcode)
+        reserved_opcode_size = reserved_opcode_sizes[opcode]
         if reserved_opcode_size >= 0:
             u.read(reserved_opcode_size)
             continue
 
         if opcode == Op.ClipRgn:
-            length, = u.unpack(">H")
+            length, = u.unpack_struct(ushort_struct)
             if length != 0x0A:
                 u.read(length - 2)
-            frame_rect = PICTRect(*u.unpack(">4h"))
+            frame_rect = PICTRect(*u.unpack_struct(rect_struct))
             if frame_rect != canvas_rect:
                 print(f"!!! clip rect {frame_rect} differs from canvas rect {canvas_rect}")
 
-        elif opcode in (Op.BitsRect, Op.BitsRgn,
-                        Op.PackBitsRect, Op.PackBitsRgn,
-                        Op.DirectBitsRect, Op.DirectBitsRgn):
+        elif opcode in bits_opcodes:
             raster_rect, raster_32bit = read_pict_bits(u, opcode)
-            canvas_32bit = blit_32bit(raster_rect, raster_32bit, canvas_rect, canvas_32bit)
+            blit_32bit(raster_rect, raster_32bit, canvas_rect, canvas_32bit)
 
         elif opcode == Op.EndOfPicture:  # done
             break
 
         elif 0x00D0 <= opcode <= 0x00FE:  # reserved
-            length, = u.unpack(">H")
+            length, = u.unpack_struct(ushort_struct)
             u.read(length)
 
         elif opcode in opcode_templates:
             # Skip opcode
-            if opcode not in (Op.LongComment, Op.LongText, Op.ShortComment, Op.DefHilite):
-                print(F"!!! skipping PICT opcode {opcode_name} at offset {u.offset}")
+            if opcode not in quietly_skipped_opcodes:
+                print(F"!!! skipping PICT opcode {get_opcode_name(opcode)} at offset {u.offset}")
 
             template = opcode_templates[opcode]
-            values = u.unpack(template.format)
+            values = u.unpack_struct(template.struct)
             annotated = template.tag_values(values)
 
             # Skip rest of variable-length records
             if "len" in annotated:
                 # if opcode in (Op.LongText, Op.LongComment):
                 #     text = u.read(annotated["len"]).decode(get_global_encoding(), "replace")
-                #     print(F"{opcode_name} text contents: {text}")
+                #     print(F"{get_opcode_name(opcode)} text contents: {text}")
                 #     continue
                 u.skip(annotated["len"])
             elif "datalen" in annotated:
                 u.skip(annotated["datalen"] - template.record_length)
 
         else:
-            raise PICTError(F"unsupported PICT opcode {opcode_name}")
+            raise PICTError(F"unsupported PICT opcode {get_opcode_name(opcode)}")
+
+    return canvas_rect.width, canvas_rect.height, bytes(canvas_32bit)
 
-    return canvas_rect.width, canvas_rect.height, canvas_32bit
+
+def make_pixel_extraction_tables(pixelsize: int) -> list[bytes]:
+    """ Returns one bytes.translate table per pixel in a byte, leftmost pixel first. """
+    mask = (1 << pixelsize) - 1
+    return [
+        bytes((byte >> shift) & mask for byte in range(256))
+        for shift in range(8 - pixelsize, -1, -pixelsize)
+    ]
+
+
+pixel_extraction_tables = {pixelsize: make_pixel_extraction_tables(pixelsize) for pixelsize in (1, 2, 4)}
 
 
 def convert_to_8bit(raw: bytes, pixelsize: int) -> bytes:
     if pixelsize == 8:
         return raw
-    
-    out = io.BytesIO()
-
-    if pixelsize == 4:
-        for byte in raw:
-            high = (byte >> 4) & 0b1111
-            low = byte & 0b1111
-            out.write(struct.pack(">BB", high, low))
-
-    elif pixelsize == 2:
-        for byte in raw:
-            i = (byte >> 6) & 0b11
-            j = (byte >> 4) & 0b11
-            k = (byte >> 2) & 0b11
-            l = (byte) & 0b11
-            out.write(struct.pack(">BBBB", i, j, k, l))
-
-    elif pixelsize == 1:
-        for byte in raw:
-            for bitno in range(7, -1, -1):
-                on = 0 != ((byte >> bitno) & 1)
-                out.write(b'\1' if on else b'\0')
 
-    else:
+    if pixelsize not in pixel_extraction_tables:
         raise ArgumentError(F"unsupported pixelsize {pixelsize}")
 
-    return out.getvalue()
+    # Pull out the n-th pixel of every byte with a translate, and interleave the results
+    tables = pixel_extraction_tables[pixelsize]
+    pixels_per_byte = len(tables)
+    out = bytearray(len(raw) * pixels_per_byte)
+    for nth, table in enumerate(tables):
+        out[nth::pixels_per_byte] = raw.translate(table)
+    return bytes(out)
 
 
 def trim_excess_columns_8bit(raw8: bytes, raster: Xmap) -> bytes:
@@ -843,19 +892,46 @@ def trim_excess_columns_8bit(raw8: bytes, raster: Xmap) -> bytes:
     excess = raster.excesscolumns
     if excess <= 0:
         return raw8
-    out = io.BytesIO()
-    for y in range(h):
-        out.write(raw8[y*(w+excess) : y*(w+excess) + w])
-    return out.getvalue()
+    stride = w + excess
+    view = memoryview(raw8)  # slice rows without copying them twice
+    return b"".join(view[y*stride : y*stride + w] for y in range(h))
 
 
 def convert_indexed_8bit_to_32bit(pixels8: bytes, palette: list[bytes]) -> bytes:
-    out = io.BytesIO()
-    for px in pixels8:
-        color = palette[px]
-        assert len(color) == 4, "each color in the palette should be 4 bytes"
-        out.write(color)
-    return out.getvalue()
+    assert all(len(color) == 4 for color in palette), "each color in the palette should be 4 bytes"
+    return b"".join(map(palette.__getitem__, pixels8))
+
+
+# Maps any non-zero mask pixel to an opaque alpha value
+mask_to_alpha_table = bytes([0x00]) + bytes([0xFF]) * 255
+
+
+def make_packed_palette_lut(palette: list[bytes], pixelsize: int) -> list[bytes]:
+    """ Maps every byte of packed indexed pixels to the BGRA colors of all the pixels it holds. """
+    if pixelsize == 8:
+        return palette
+
+    if pixelsize not in pixel_extraction_tables:
+        raise ArgumentError(F"unsupported pixelsize {pixelsize}")
+
+    tables = pixel_extraction_tables[pixelsize]
+    return [b"".join(palette[table[byte]] for table in tables) for byte in range(256)]
+
+
+def convert_indexed_to_32bit(raw: bytes, raster: Xmap, palette: list[bytes]) -> bytes:
+    """ Equivalent to convert_to_8bit, trim_excess_columns_8bit and convert_indexed_8bit_to_32bit in a row,
+    but each packed byte goes straight to BGRA so that no intermediate 8-bit image is built. """
+    assert all(len(color) == 4 for color in palette), "each color in the palette should be 4 bytes"
+    lut = make_packed_palette_lut(palette, raster.pixelsize)
+    bgra = b"".join(map(lut.__getitem__, raw))
+
+    if raster.excesscolumns <= 0:
+        return bgra
+
+    stride = 4 * raster.pixelsperrow
+    row_length = 4 * raster.width
+    view = memoryview(bgra)
+    return b"".join(view[y*stride : y*stride + row_length] for y in range(raster.height))
 
 
 def convert_cicn_to_image(data: bytes) -> tuple[int, int, bytes]:
@@ -894,14 +970,12 @@ def convert_cicn_to_image(data: bytes) -> tuple[int, int, bytes]:
     mask8 = trim_excess_columns_8bit(mask8, maskbm)
     bwicon8 = trim_excess_columns_8bit(bwicon8, bwiconbm)
 
-    dst = io.BytesIO()
-    for px,mask in zip(raw,mask8):
-        color = palette[px]
-        assert len(color) == 4
-        dst.write(color[:3])
-        dst.write(b'\xFF' if mask != 0 else b'\x00')
+    # Look up the colors in one go, then overwrite the alpha channel with the mask
+    numpixels = min(len(raw), len(mask8))
+    dst = bytearray(convert_indexed_8bit_to_32bit(raw[:numpixels], palette))
+    dst[3::4] = mask8[:numpixels].translate(mask_to_alpha_table)
 
-    return iconpm.width, iconpm.height, dst.getvalue()
+    return iconpm.width, iconpm.height, bytes(dst)
 
 
 def convert_ppat_to_image(data: bytes) -> tuple[int, int, bytes]:
@@ -928,23 +1002,12 @@ def convert_ppat_to_image(data: bytes) -> tuple[int, int, bytes]:
     image_data = u.read(pm.pmtable - pat_data)  # pm.pmtable = offset to clut
     palette = read_colortable(u)
 
-    image8 = convert_to_8bit(image_data, pm.pixelsize)
-
-    image8 = trim_excess_columns_8bit(image8, pm)
-    
-    bgra = io.BytesIO()
-    for px in image8:
-        bgra.write(palette[px])
-    return pm.width, pm.height, bgra.getvalue()
+    bgra = convert_indexed_to_32bit(image_data, pm, palette)
+    return pm.width, pm.height, bgra
 
 
 def convert_sicn_to_image(data: bytes) -> tuple[int, int, bytes]:
     num_icons = len(data) // 32
-    image8 = convert_to_8bit(data, 1)
-    bgra = io.BytesIO()
-    for px in image8:
-        if px != 0:
-            bgra.write(b'\x00\x00\x00\xFF')
-        else:
-            bgra.write(b'\xFF\xFF\xFF\xFF')
-    return 16, num_icons*16, bgra.getvalue()
+    # Each input byte expands straight to 8 black or white BGRA pixels
+    bgra = b"".join(map(bgra_lut_1bit.__getitem__, data))
+    return 16, num_icons*16, bgra
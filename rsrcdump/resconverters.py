@@ -1,4 +1,3 @@
-import base64
 from typing import Any, Callable
 
 from rsrcdump.icons import convert_4bit_icon_to_bgra, convert_8bit_icon_to_bgra, convert_1bit_icon_to_bgra
@@ -8,7 +7,7 @@ from rsrcdump.png import pack_png
 from rsrcdump.resfork import Resource, ResourceFork
 from rsrcdump.sndtoaiff import convert_snd_to_aiff
 from rsrcdump.structtemplate import StructTemplate
-from rsrcdump.textio import get_global_encoding, parse_type_name
+from rsrcdump.textio import get_global_encoding, parse_type_name, encode_blob, decode_blob
 
 
 class ResourceConverter:
@@ -28,18 +27,18 @@ class ResourceConverter:
 
     
 class Base16Converter(ResourceConverter):
-    """ Converts arbitrary data to base-16. """
+    """ Converts arbitrary data to base-16 (or base-64 if selected with set_global_blob_encoding). """
 
     def __init__(self):
         super().__init__()
         self.json_key = "data"
     
     def unpack(self, res: Resource, fork: ResourceFork) -> Any:
-        return base64.b16encode(res.data).decode('ascii')
+        return encode_blob(res.data)
 
     def pack(self, obj: Any) -> bytes:
         assert isinstance(obj, str)
-        return base64.b16decode(obj)
+        return decode_blob(obj)
 
 
 class StructConverter(ResourceConverter):
@@ -250,6 +249,9 @@ TMPL_types = {
     b'TNAM': '4s',  # type name
 }
 
+# Converters are stateless, so a single instance serves every resource type that has no specific converter
+base16_converter = Base16Converter()
+
 standard_converters = {
     b'cicn': CicnConverter(),
     b'icl4': IconConverter(),
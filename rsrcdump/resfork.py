@@ -106,8 +106,10 @@ class ResourceFork:
         if data_offset + data_length > len(data) or map_offset + map_length > len(data):
             raise InvalidResourceFork("offsets/lengths in header are nonsense")
 
-        u_data = Unpacker(data[data_offset: data_offset + data_length])
-        u_map = Unpacker(data[map_offset: map_offset + map_length])
+        # Work on views of the input so the data and map sections aren't copied wholesale
+        view = memoryview(data)
+        u_data = Unpacker(view[data_offset: data_offset + data_length])
+        u_map = Unpacker(view[map_offset: map_offset + map_length])
 
         u_map.skip(16)  # skip copy of resource header
         fork.junk_nextresmap, fork.junk_filerefnum, fork.file_attributes = u_map.unpack(">LHH")
@@ -127,8 +129,7 @@ class ResourceFork:
             fork.tree[res_type] = {}
 
             u_types.seek(reslist_offset)
-            for j in range(res_count):
-                res_id, res_name_offset, res_packed_attr, res_junk = u_types.unpack(">hHLL")
+            for res_id, res_name_offset, res_packed_attr, res_junk in u_types.iter_unpack(">hHLL", res_count):
 
                 # unpack attributes
                 res_flags = (res_packed_attr & 0xFF000000) >> 24
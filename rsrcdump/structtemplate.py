@@ -1,10 +1,12 @@
-import base64
 import struct
 from typing import Any, Generator
 
+from rsrcdump.textio import decode_blob
+
 
 class StructTemplate:
     format: str
+    struct: struct.Struct
     record_length: int
     field_formats: list[str]
     field_names: list[str]
@@ -67,7 +69,8 @@ class StructTemplate:
 
         self.field_formats = list(StructTemplate.split_struct_format_fields(fmt))
         self.format = fmt
-        self.record_length = struct.calcsize(fmt)
+        self.struct = struct.Struct(fmt)
+        self.record_length = self.struct.size
         self.is_list = is_list
         self.is_scalar = len(self.field_formats) == 1
 
@@ -87,7 +90,7 @@ class StructTemplate:
                 self.field_names.append(name)
 
     def unpack_record(self, data: bytes, offset: int) -> Any:
-        values = struct.unpack_from(self.format, data, offset)
+        values = self.struct.unpack_from(data, offset)
         return self.tag_values(values)
 
     def tag_values(self, values: tuple):
@@ -113,22 +116,19 @@ class StructTemplate:
             return self.pack_record(obj)
         else:
             assert isinstance(obj, list)
-            buf = b""
-            for item in obj:
-                buf += self.pack_record(item)
-            return buf
+            return b"".join(self.pack_record(item) for item in obj)
 
     def pack_record(self, json_obj: Any) -> bytes:
         def process_json_field(_field_format, _field_value):
             if _field_format.endswith("s"):
-                return base64.b16decode(_field_value)
+                return decode_blob(_field_value)
             else:
                 return _field_value
 
         if self.is_scalar:
             assert not isinstance(json_obj, list) and not isinstance(json_obj, dict)
             value = process_json_field(self.field_formats[0], json_obj)
-            return struct.pack(self.format, value)
+            return self.struct.pack(value)
 
         elif self.field_names:
             assert isinstance(json_obj, dict)
@@ -137,7 +137,7 @@ class StructTemplate:
                 value = json_obj[field_name]
                 value = process_json_field(field_format, value)
                 values.append(value)
-            return struct.pack(self.format, *values)
+            return self.struct.pack(*values)
 
         else:
             assert isinstance(json_obj, list)
@@ -145,7 +145,7 @@ class StructTemplate:
             for field_format, value in zip(self.field_formats, json_obj):
                 value = process_json_field(field_format, value)
                 values.append(value)
-            return struct.pack(self.format, *values)
+            return self.struct.pack(*values)
 
 
 
@@ -1,7 +1,13 @@
+from contextlib import contextmanager
+from typing import Iterator
 from urllib.parse import quote_from_bytes, unquote_to_bytes
+import binascii
 
 GLOBAL_ENCODING = 'macroman'
 
+GLOBAL_BLOB_ENCODING = 'base16'
+BLOB_ENCODINGS = ('base16', 'base64')
+
 
 def get_global_encoding() -> str:
     return GLOBAL_ENCODING
@@ -12,6 +18,43 @@ def set_global_encoding(encoding: str) -> str:
     GLOBAL_ENCODING = encoding
 
 
+def get_global_blob_encoding() -> str:
+    return GLOBAL_BLOB_ENCODING
+
+
+def set_global_blob_encoding(blob_encoding: str) -> None:
+    global GLOBAL_BLOB_ENCODING
+    if blob_encoding not in BLOB_ENCODINGS:
+        raise ValueError(f"unsupported blob encoding '{blob_encoding}'")
+    GLOBAL_BLOB_ENCODING = blob_encoding
+
+
+@contextmanager
+def scoped_blob_encoding(blob_encoding: str) -> Iterator[None]:
+    """ Switches the blob encoding for the duration of a with-block, then restores the previous one. """
+    global GLOBAL_BLOB_ENCODING
+    previous = GLOBAL_BLOB_ENCODING
+    set_global_blob_encoding(blob_encoding)
+    try:
+        yield
+    finally:
+        GLOBAL_BLOB_ENCODING = previous
+
+
+def encode_blob(data: bytes) -> str:
+    """ Encodes raw binary data as text for the JSON output (hex by default). """
+    if GLOBAL_BLOB_ENCODING == 'base64':
+        return binascii.b2a_base64(data, newline=False).decode('ascii')
+    return binascii.b2a_hex(data).upper().decode('ascii')
+
+
+def decode_blob(text: str) -> bytes:
+    """ Decodes binary data that was encoded with encode_blob. """
+    if GLOBAL_BLOB_ENCODING == 'base64':
+        return binascii.a2b_base64(text)
+    return binascii.a2b_hex(text)
+
+
 def sanitize_type_name(restype: bytes) -> str:
     if len(restype) != 4:
         raise ValueError(f"restype isn't 4 bytes")